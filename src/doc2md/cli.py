@@ -1,5 +1,7 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, List, Tuple
 
 import typer
 from rich.console import Console
@@ -7,10 +9,15 @@ from rich.progress import Progress
 from slugify import slugify
 
 from . import navigation, postprocess, preprocess, prompt_builder, splitter, validators
-from .config import DEFAULT_MODEL, DEFAULT_PROVIDER, OPENROUTER_DEFAULT_MODEL, MISTRAL_DEFAULT_MODEL
-from .llm_client import ClientFactory
-
-logging.basicConfig(level=logging.INFO)
+from .config import (
+    CONFIG_WARNINGS,
+    DEFAULT_MODEL,
+    DEFAULT_PROVIDER,
+    LOG_LEVEL,
+    MISTRAL_DEFAULT_MODEL,
+    OPENROUTER_DEFAULT_MODEL,
+)
+from .llm_client import BaseLLMClient, ClientFactory
 
 app = typer.Typer(help="Convert DOCX documentation to Markdown.")
 console = Console()
@@ -24,6 +31,64 @@ def get_default_model_for_provider(provider: str) -> str:
         return OPENROUTER_DEFAULT_MODEL
 
 
+def _log_level(name: str) -> int | None:
+    """Resolve a DOC2MD_LOG value given as a level name or number."""
+    if name.isdecimal():
+        return int(name)
+    return logging.getLevelNamesMapping().get(name.upper())
+
+
+def _convert_batch(
+    client: BaseLLMClient,
+    batch: List[Tuple[int, str]],
+    doc_slug: str,
+    output_path: Path,
+) -> None:
+    """Format, post-process, validate and write one group of numbered chapters."""
+    chapters = [html for _, html in batch]
+    if len(chapters) == 1:
+        results = [client.format_chapter(chapters[0])]
+    else:
+        results = client.format_chapters(chapters)
+
+    for (idx, _), (manifest, md) in zip(batch, results):
+        processed = postprocess.PostProcessor(md, idx, doc_slug).run()
+        warnings = validators.run_all_validators(processed)
+        for w in warnings:
+            logging.warning(w)
+        file_path = output_path / manifest["filename"]
+        file_path.write_bytes(processed.encode("utf-8"))
+
+
+def _convert_batches(
+    client: BaseLLMClient,
+    batches: List[List[Tuple[int, str]]],
+    doc_slug: str,
+    output_path: Path,
+    concurrency: int,
+    advance: Callable[[int], None],
+) -> None:
+    """Run ``_convert_batch`` for every batch on a pool of worker threads.
+
+    ``advance`` is called with the batch length as each batch finishes. The
+    first failure cancels batches that have not started yet and is re-raised,
+    so no further chapters are sent to the model.
+    """
+    workers = max(1, min(concurrency, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_convert_batch, client, batch, doc_slug, output_path): batch
+            for batch in batches
+        }
+        try:
+            for future in as_completed(futures):
+                future.result()
+                advance(len(futures[future]))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
 @app.callback()
 def main() -> None:
     """Main entry point for the CLI."""
@@ -57,8 +122,32 @@ def run(
     dry_run: bool = typer.Option(
         False, "--dry-run/--no-dry-run", help="Запуск без обращения к LLM."
     ),
+    concurrency: int = typer.Option(
+        4,
+        "--concurrency",
+        min=1,
+        help=(
+            "Максимальное число глав, одновременно отправляемых в LLM. "
+            "Пока в LLM уходит только 4-я глава, не влияет на запуск."
+        ),
+    ),
+    batch_size: int = typer.Option(
+        1,
+        "--batch-size",
+        min=1,
+        help=(
+            "Сколько глав объединять в один запрос к LLM. "
+            "Пока в LLM уходит только 4-я глава, не влияет на запуск."
+        ),
+    ),
 ) -> None:
     """Run the conversion pipeline."""
+    level = _log_level(LOG_LEVEL)
+    logging.basicConfig(level=logging.INFO if level is None else level)
+    if level is None:
+        logging.warning("Unknown DOC2MD_LOG level %r, using INFO", LOG_LEVEL)
+    for message in CONFIG_WARNINGS:
+        logging.warning(message)
     logging.getLogger(__name__).info("Running the pipeline")
     console.print(f"[bold green]Запуск конвертации для файла:[/] {docx_path}")
     output_path = Path(output_dir)
@@ -70,9 +159,9 @@ def run(
     html = preprocess.convert_docx_to_html(docx_path, str(style_map))
     # Remove table of contents to clean up the document
     html = preprocess.remove_table_of_contents(html)
-    chapters = splitter.split_html_by_h1(html)
-
-    # Temporary fix: only send the 4th chapter to the model
+    # Temporary fix: only send the 4th chapter to the model, so chapters after
+    # it are never split out
+    chapters = splitter.split_html_by_h1(html, limit=4)
     if len(chapters) >= 4:
         chapters = [chapters[3]]
     else:
@@ -83,14 +172,16 @@ def run(
         temp_dir.mkdir(parents=True, exist_ok=True)
 
         if chapters:
+            # The temporary fix leaves at most one chapter here, so a plain
+            # loop is enough; there is no I/O to overlap.
             for idx, chapter in enumerate(chapters, start=1):
-                (temp_dir / f"chapter_{idx}.html").write_text(chapter, encoding="utf-8")
+                (temp_dir / f"chapter_{idx}.html").write_bytes(chapter.encode("utf-8"))
             console.print(
                 f"[yellow]Dry run completed. {len(chapters)} HTML chapters saved to {temp_dir}.[/]"
             )
         else:
             # No H1 tags found, save the entire HTML as a single file
-            (temp_dir / "full_document.html").write_text(html, encoding="utf-8")
+            (temp_dir / "full_document.html").write_bytes(html.encode("utf-8"))
             console.print(
                 f"[yellow]Dry run completed. No H1 tags found, full HTML saved as full_document.html in {temp_dir}.[/]"
             )
@@ -105,17 +196,23 @@ def run(
     
     client = ClientFactory.create_client(provider, builder, model=model)
 
+    # Chapter formatting is dominated by network round-trips. Each worker runs
+    # a whole group through the pipeline, so post-processing and writing of
+    # one group overlap with requests still in flight for the others.
+    numbered = list(enumerate(chapters, start=1))
+    batches = [
+        numbered[i : i + batch_size] for i in range(0, len(numbered), batch_size)
+    ]
     with Progress() as progress:
         task = progress.add_task("Formatting chapters", total=len(chapters))
-        for idx, chapter in enumerate(chapters, start=1):
-            manifest, md = client.format_chapter(chapter)
-            processed = postprocess.PostProcessor(md, idx, doc_slug).run()
-            warnings = validators.run_all_validators(processed)
-            for w in warnings:
-                logging.warning(w)
-            file_path = output_path / manifest["filename"]
-            file_path.write_text(processed, encoding="utf-8")
-            progress.advance(task)
+        _convert_batches(
+            client,
+            batches,
+            doc_slug,
+            output_path,
+            concurrency,
+            lambda count: progress.advance(task, count),
+        )
 
     navigation.inject_navigation_and_create_toc(str(output_path))
     console.print(f"[bold green]Конвертация завершена. Результаты в:[/] {output_dir}")
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import os
+from typing import List
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,6 +26,31 @@ _mistral_base_url = os.getenv("MISTRAL_API_URL", "https://api.mistral.ai/v1")
 MISTRAL_API_URL = f"{_mistral_base_url}/chat/completions"
 MISTRAL_DEFAULT_MODEL = os.getenv("MISTRAL_MODEL", "mistral-large-latest")
 
+# Problems found while reading the environment; the CLI logs them on start
+CONFIG_WARNINGS: List[str] = []
+
+
+def _rate_limit(name: str) -> float:
+    """Read a per-minute limit, disabling it (0) when the value is invalid."""
+    raw = os.getenv(name, "0")
+    try:
+        value = float(raw)
+    except ValueError:
+        value = -1.0
+    # Also rejects negative values and NaN
+    if not value >= 0:
+        CONFIG_WARNINGS.append(f"Invalid {name}={raw!r}, limit disabled")
+        return 0.0
+    return value
+
+
+# Client-side rate limits shared by all providers (0 disables a limit)
+MAX_REQUESTS_PER_MINUTE = _rate_limit("DOC2MD_MAX_REQUESTS_PER_MINUTE")
+MAX_TOKENS_PER_MINUTE = _rate_limit("DOC2MD_MAX_TOKENS_PER_MINUTE")
+
+# Log level applied by the CLI when it starts a run
+LOG_LEVEL = os.getenv("DOC2MD_LOG", "INFO").upper()
+
 # Backward compatibility
 API_KEY = OPENROUTER_API_KEY
 API_URL = OPENROUTER_API_URL
@@ -41,6 +68,10 @@ __all__ = [
     "MISTRAL_API_KEY",
     "MISTRAL_API_URL",
     "MISTRAL_DEFAULT_MODEL",
+    "MAX_REQUESTS_PER_MINUTE",
+    "MAX_TOKENS_PER_MINUTE",
+    "LOG_LEVEL",
+    "CONFIG_WARNINGS",
     # Backward compatibility
     "API_KEY",
     "API_URL", 
@@ -2,9 +2,181 @@
 
 from __future__ import annotations
 
+import os
 import re
-from typing import Dict, List, Tuple
-from docx import Document
+import zipfile
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, List, Set, Tuple
+
+from lxml import etree
+
+# Clark-notation names of the WordprocessingML elements read below
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = f"{_W}body"
+_W_P = f"{_W}p"
+_W_PPR = f"{_W}pPr"
+_W_PSTYLE = f"{_W}pStyle"
+_W_R = f"{_W}r"
+_W_HYPERLINK = f"{_W}hyperlink"
+_W_T = f"{_W}t"
+_W_BR = f"{_W}br"
+_W_STYLE = f"{_W}style"
+_W_NAME = f"{_W}name"
+_W_VAL = f"{_W}val"
+_W_TYPE = f"{_W}type"
+_W_STYLE_ID = f"{_W}styleId"
+_W_DEFAULT = f"{_W}default"
+
+# Text equivalents of run content other than w:t, as python-docx renders them
+_RUN_SPECIAL_TEXT = {
+    f"{_W}tab": "\t",
+    f"{_W}ptab": "\t",
+    f"{_W}cr": "\n",
+    f"{_W}noBreakHyphen": "-",
+}
+
+_TOC_LEVEL_RE = re.compile(r"toc (\d+)")
+
+# Bookmark anchor Mammoth emits in front of each heading
+_REF_ANCHOR = r'<a id="__RefHeading___\d+"></a>'
+_REF_ANCHOR_RE = re.compile(_REF_ANCHOR)
+
+
+@lru_cache(maxsize=None)
+def _toc_level(style_name: str) -> int | None:
+    """Return the TOC level encoded in a style name such as ``toc 2``.
+
+    Documents use only a handful of styles, so the result is memoized per
+    style name instead of being recomputed for every paragraph.
+    """
+    if not style_name.startswith("toc"):
+        return None
+    level_match = _TOC_LEVEL_RE.search(style_name)
+    if not level_match:
+        return None
+    return int(level_match.group(1))
+
+
+def _parse_toc_line(text: str) -> Tuple[str, str] | None:
+    """Split a numbered TOC entry into its number and title.
+
+    Handles stripped lines such as ``"4.1.2.1 Подготовка конфигурационных
+    файлов\t42"``: a dotted number, whitespace, the title and an optional
+    tab-separated page number. Returns ``None`` for any other line.
+    """
+    parts = text.split(None, 1)
+    if len(parts) != 2:
+        return None
+    number, rest = parts
+    if not all(part.isdecimal() for part in number.split(".")):
+        return None
+    title, tab, page = rest.partition("\t")
+    if tab and not page.isdecimal():
+        return None
+    return number, title.strip()
+
+
+def _paragraph_style_names(docx: zipfile.ZipFile) -> Tuple[Dict[str, str], str]:
+    """Map paragraph style ids to names and return the default style name."""
+    names: Dict[str, str] = {}
+    default = ""
+    try:
+        styles = etree.fromstring(docx.read("word/styles.xml"))
+    except KeyError:
+        return names, default
+    for style in styles.iter(_W_STYLE):
+        if style.get(_W_TYPE) != "paragraph":
+            continue
+        name_el = style.find(_W_NAME)
+        name = name_el.get(_W_VAL, "") if name_el is not None else ""
+        names[style.get(_W_STYLE_ID, "")] = name
+        if style.get(_W_DEFAULT) in ("1", "true", "on"):
+            default = name
+    return names, default
+
+
+def _run_text(run: etree._Element) -> str:
+    parts = []
+    for child in run:
+        if child.tag == _W_T:
+            parts.append(child.text or "")
+        elif child.tag == _W_BR:
+            if child.get(_W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_SPECIAL_TEXT.get(child.tag, ""))
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph: etree._Element) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            parts.append(_run_text(child))
+        elif child.tag == _W_HYPERLINK:
+            parts.extend(_run_text(run) for run in child.iterchildren(_W_R))
+    return "".join(parts)
+
+
+def _iter_body_paragraphs(docx_path: str) -> Iterator[Tuple[str, etree._Element]]:
+    """Stream top-level body paragraphs as (style name, element) pairs.
+
+    ``word/document.xml`` is parsed incrementally and each paragraph is
+    discarded once yielded, so memory stays bounded by a single paragraph
+    rather than the whole document tree.
+    """
+    with zipfile.ZipFile(docx_path) as docx:
+        style_names, default_style = _paragraph_style_names(docx)
+        with docx.open("word/document.xml") as source:
+            for _, paragraph in etree.iterparse(source, events=("end",), tag=_W_P):
+                parent = paragraph.getparent()
+                if parent is None or parent.tag != _W_BODY:
+                    continue  # Paragraphs nested in tables and other blocks
+
+                style_id = None
+                ppr = paragraph.find(_W_PPR)
+                if ppr is not None:
+                    pstyle = ppr.find(_W_PSTYLE)
+                    if pstyle is not None:
+                        style_id = pstyle.get(_W_VAL)
+                yield style_names.get(style_id or "", default_style), paragraph
+
+                paragraph.clear()
+                while paragraph.getprevious() is not None:
+                    del parent[0]
+
+
+@lru_cache(maxsize=8)
+def _load_toc_entries(
+    docx_path: str, mtime_ns: int, size: int
+) -> Tuple[Tuple[int, str, str], ...]:
+    """Parse numbered TOC entries; cached on path, modification time and size."""
+    entries = []
+
+    for style_name, paragraph in _iter_body_paragraphs(docx_path):
+        # Filter on style first: building the text walks every run, and only
+        # TOC paragraphs (styles toc 1, toc 2, etc.) are of interest.
+        level = _toc_level(style_name)
+        if level is None:
+            continue
+
+        text = _paragraph_text(paragraph).strip()
+        if not text:
+            continue
+
+        # Extract number and title
+        parsed = _parse_toc_line(text)
+        if parsed:
+            number, title = parsed
+            entries.append((level, number, title))
+
+    return tuple(entries)
+
+
+def _toc_entries(docx_path: str) -> Tuple[Tuple[int, str, str], ...]:
+    """Return the TOC entries of a DOCX file, parsing it only when it changed."""
+    stat = os.stat(docx_path)
+    return _load_toc_entries(str(docx_path), stat.st_mtime_ns, stat.st_size)
 
 
 def extract_heading_numbering_from_toc(docx_path: str) -> Dict[str, str]:
@@ -18,27 +190,7 @@ def extract_heading_numbering_from_toc(docx_path: str) -> Dict[str, str]:
         Dictionary mapping heading text (without numbers) to their numbers
         Example: {"Общие сведения": "1", "Назначение": "1.1", "Подготовка конфигурационных файлов": "4.1.2.1"}
     """
-    doc = Document(docx_path)
-    numbering_map: Dict[str, str] = {}
-
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.strip()
-        if not text:
-            continue
-
-        style = paragraph.style
-        if style is None or not style.name.startswith("toc"):
-            continue
-
-            # Check if this is a TOC entry with numbering
-            # Pattern to match numbered TOC entries like "4.1.2.1 Подготовка конфигурационных файлов\t42"
-            match = re.match(r"^(\d+(?:\.\d+)*)\s+([^\t]+)(?:\t\d+)?$", text)
-            if match:
-                number = match.group(1)
-                title = match.group(2).strip()
-                numbering_map[title] = number
-
-    return numbering_map
+    return {title: number for _, number, title in _toc_entries(docx_path)}
 
 
 def extract_heading_structure_from_toc(docx_path: str) -> List[Tuple[int, str, str]]:
@@ -52,42 +204,59 @@ def extract_heading_structure_from_toc(docx_path: str) -> List[Tuple[int, str, s
         List of tuples (level, number, title) sorted by document order
         Example: [(1, "1", "Общие сведения"), (2, "1.1", "Назначение"), (4, "4.1.2.1", "Подготовка")]
     """
-    doc = Document(docx_path)
-    headings = []
+    return list(_toc_entries(docx_path))
 
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.strip()
-        if not text:
-            continue
 
-        style = paragraph.style
-        if style is None or not style.name.startswith("toc"):
-            continue
+class TitleIndex:
+    """Inverted word index over the titles of a numbering map.
 
-        # Extract level from style name (toc 1, toc 2, etc.)
-        level_match = re.search(r"toc (\d+)", style.name)
-        if not level_match:
-            continue
-
-        level = int(level_match.group(1))
-
-        # Extract number and title
-        match = re.match(r"^(\d+(?:\.\d+)*)\s+([^\t]+)(?:\t\d+)?$", text)
-        if match:
-            number = match.group(1)
-            title = match.group(2).strip()
-            headings.append((level, number, title))
+    The index is a snapshot: build a new one after changing the map.
+    """
 
-    return headings
+    def __init__(self, numbering_map: Dict[str, str]) -> None:
+        self.entries: List[Tuple[FrozenSet[str], str]] = []
+        self.postings: Dict[str, List[int]] = {}
+        for position, (title, number) in enumerate(numbering_map.items()):
+            words = frozenset(title.lower().split())
+            self.entries.append((words, number))
+            for word in words:
+                self.postings.setdefault(word, []).append(position)
+
+    def candidates(self, words: Set[str]) -> List[int]:
+        """Positions of titles sharing at least one word, in map order."""
+        positions: Set[int] = set()
+        for word in words:
+            positions.update(self.postings.get(word, ()))
+        return sorted(positions)
+
+
+@lru_cache(maxsize=8)
+def _title_index(items: Tuple[Tuple[str, str], ...]) -> TitleIndex:
+    """Return the index for a snapshot of a numbering map's items.
+
+    Keying on the items rather than the dict keeps the index correct when the
+    caller mutates the map, and avoids holding a reference to it.
+    """
+    return TitleIndex(dict(items))
 
 
-def get_heading_number_for_text(text: str, numbering_map: Dict[str, str]) -> str | None:
+def get_heading_number_for_text(
+    text: str, numbering_map: Dict[str, str], index: TitleIndex | None = None
+) -> str | None:
     """
     Find the heading number for a given text by fuzzy matching against the numbering map.
 
+    Without ``index``, the fuzzy lookup snapshots the map's items to find its
+    cached index, which still costs O(number of titles) per call. Callers
+    matching many headings against one map should build
+    ``TitleIndex(numbering_map)`` once and pass it in; only titles sharing a
+    word with ``text`` are then scored.
+
     Args:
         text: The heading text to match
         numbering_map: Dictionary from extract_heading_numbering_from_toc
+        index: Optional prebuilt TitleIndex of ``numbering_map``; rebuild it
+            after changing the map
 
     Returns:
         The heading number if found, None otherwise
@@ -98,23 +267,26 @@ def get_heading_number_for_text(text: str, numbering_map: Dict[str, str]) -> str
     if text in numbering_map:
         return numbering_map[text]
 
-    # Try fuzzy matching - look for text that contains the same words
+    # Try fuzzy matching - look for text that contains the same words.
+    # Only titles sharing a word can reach the threshold, so the inverted
+    # index narrows the scan to those candidates.
     text_words = set(text.lower().split())
+    if index is None:
+        index = _title_index(tuple(numbering_map.items()))
     best_match = None
     best_score = 0.0
 
-    for toc_title, number in numbering_map.items():
-        toc_words = set(toc_title.lower().split())
+    for position in index.candidates(text_words):
+        toc_words, number = index.entries[position]
 
         # Calculate similarity score (intersection over union)
         intersection = len(text_words & toc_words)
-        union = len(text_words | toc_words)
+        union = len(text_words) + len(toc_words) - intersection
 
-        if union > 0:
-            score = intersection / union
-            if score > best_score and score > 0.5:  # At least 50% similarity
-                best_score = score
-                best_match = number
+        score = intersection / union
+        if score > best_score and score > 0.5:  # At least 50% similarity
+            best_score = score
+            best_match = number
 
     return best_match
 
@@ -131,8 +303,6 @@ def add_numbering_to_html(html_content: str, docx_path: str) -> str:
     Returns:
         HTML content with numbered headings
     """
-    import re
-
     # Extract heading structure from DOCX
     heading_structure = extract_heading_structure_from_toc(docx_path)
 
@@ -145,18 +315,17 @@ def add_numbering_to_html(html_content: str, docx_path: str) -> str:
     for level, number, title in heading_structure:
         escaped_title = re.escape(title)
         pattern = re.compile(
-            rf'<a id="__RefHeading___\d+"></a>\s*(?:<[^>]+>\s*)*{escaped_title}',
-            flags=re.IGNORECASE,
+            rf"{_REF_ANCHOR}\s*(?:<[^>]+>\s*)*{escaped_title}", flags=re.IGNORECASE
         )
         replacement = f"<h{level}>{number} {title}</h{level}>"
         result, count = pattern.subn(replacement, result, count=1)
 
         if count == 0:
             # Remove unmatched anchor to avoid leaking into output
-            result = re.sub(r'<a id="__RefHeading___\d+"></a>', "", result, count=1)
+            result = _REF_ANCHOR_RE.sub("", result, count=1)
 
     # Clean up any remaining reference anchors
-    result = re.sub(r'<a id="__RefHeading___\d+"></a>', "", result)
+    result = _REF_ANCHOR_RE.sub("", result)
     return result
 
 
@@ -3,13 +3,12 @@
 from __future__ import annotations
 
 import json
-import re
+import random
 import time
-from typing import Any, Dict, List, Protocol, Tuple, cast
+from typing import Any, Callable, Dict, Iterator, List, Protocol, Tuple, cast
 from bs4 import BeautifulSoup
 
 import httpx
-from jsonschema import validate
 
 from .config import (
     # OpenRouter config
@@ -22,11 +21,67 @@ from .config import (
     MISTRAL_API_KEY,
     MISTRAL_API_URL,
     MISTRAL_DEFAULT_MODEL,
+    # Shared rate limits
+    MAX_REQUESTS_PER_MINUTE,
+    MAX_TOKENS_PER_MINUTE,
     # Backward compatibility (used in tests / monkeypatching)
     HTTP_REFERER,  # noqa: F401
     APP_TITLE,  # noqa: F401
 )
-from .schema import CHAPTER_MANIFEST_SCHEMA
+from .rate_limiter import RateLimiter
+from .schema import CHAPTER_MANIFEST_VALIDATOR
+
+# Rough prompt size estimate used to charge the tokens-per-minute budget.
+CHARS_PER_TOKEN = 4
+
+# One pooled client serves every chapter and retry; keep-alive connections
+# skip the TCP/TLS handshake when requests run concurrently.
+DEFAULT_HTTP_LIMITS = httpx.Limits(
+    max_connections=32, max_keepalive_connections=32, keepalive_expiry=60.0
+)
+DEFAULT_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Fences of the legacy format: a json manifest block and a markdown body block
+_JSON_FENCE = "```json\n"
+_MARKDOWN_FENCE = "```markdown\n"
+_CLOSING_FENCE = "\n```"
+
+# Parsed (manifest, markdown) pairs, and whether they came from the JSON-object
+# format rather than the legacy fenced blocks
+ParsedChapters = Tuple[List[Tuple[Dict[str, Any], str]], bool]
+
+
+def _find_fenced_block(
+    content: str, fence: str, start: int = 0
+) -> Tuple[str, int] | None:
+    """Return the body of the first ``fence`` block at or after ``start``.
+
+    The body is returned with the offset just past its closing fence. The
+    fences are fixed literals, so plain ``str.find`` locates them without
+    going through the regex engine on potentially large responses.
+    """
+    begin = content.find(fence, start)
+    if begin == -1:
+        return None
+    begin += len(fence)
+    end = content.find(_CLOSING_FENCE, begin)
+    if end == -1:
+        return None
+    return content[begin:end], end + len(_CLOSING_FENCE)
+
+
+def _iter_fenced_chapters(content: str) -> Iterator[Tuple[str, str]]:
+    """Yield ``(manifest_json, markdown)`` for consecutive json/markdown blocks."""
+    pos = 0
+    while True:
+        manifest = _find_fenced_block(content, _JSON_FENCE, pos)
+        if manifest is None:
+            return
+        markdown = _find_fenced_block(content, _MARKDOWN_FENCE, manifest[1])
+        if markdown is None:
+            return
+        yield manifest[0], markdown[0]
+        pos = markdown[1]
 
 
 class PromptBuilderProtocol(Protocol):
@@ -36,6 +91,10 @@ class PromptBuilderProtocol(Protocol):
         self, chapter_html: str
     ) -> List[Dict[str, str]]: ...  # pragma: no cover - interface
 
+    def build_for_chapters(
+        self, chapters: List[str]
+    ) -> List[Dict[str, str]]: ...  # pragma: no cover - interface
+
 
 class BaseLLMClient:
     """Base class for LLM clients."""
@@ -49,13 +108,19 @@ class BaseLLMClient:
         api_url: str | None = None,
         max_retries: int = 5,
         client: httpx.Client | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         self.prompt_builder = prompt_builder
         self.api_key = api_key
         self.model = model
         self.api_url = api_url
         self.max_retries = max_retries
-        self._client = client or httpx.Client(timeout=30.0)
+        self._client = client or httpx.Client(
+            limits=DEFAULT_HTTP_LIMITS, timeout=DEFAULT_HTTP_TIMEOUT
+        )
+        self.rate_limiter = rate_limiter or RateLimiter(
+            MAX_REQUESTS_PER_MINUTE, MAX_TOKENS_PER_MINUTE
+        )
 
     def _validate_content_completeness(
         self, html_input: str, markdown_output: str
@@ -105,18 +170,55 @@ class BaseLLMClient:
     def format_chapter(self, chapter_html: str) -> Tuple[Dict[str, Any], str]:
         """Format a chapter of HTML via the LLM API."""
         messages = self.prompt_builder.build_for_chapter(chapter_html)
+
+        def parse(content: str) -> ParsedChapters:
+            manifest, markdown, structured = self._parse_chapter(content)
+            return [(manifest, markdown)], structured
+
+        return self._request_formatting(messages, [chapter_html], parse)[0]
+
+    def format_chapters(self, chapters: List[str]) -> List[Tuple[Dict[str, Any], str]]:
+        """Format several chapters with a single LLM request.
+
+        Results are returned in the same order as ``chapters``.
+        """
+        messages = self.prompt_builder.build_for_chapters(chapters)
+        return self._request_formatting(
+            messages,
+            chapters,
+            lambda content: self._parse_chapter_batch(content, len(chapters)),
+        )
+
+    def _request_formatting(
+        self,
+        messages: List[Dict[str, str]],
+        chapters: List[str],
+        parse: Callable[[str], ParsedChapters],
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """Send ``messages`` with retries and parse the formatted chapters.
+
+        Only JSON-object responses are checked for completeness; legacy fenced
+        responses are returned as parsed.
+        """
         payload = self._build_payload(messages)
         headers = self._get_headers()
+        estimated_tokens = self._estimate_tokens(messages)
 
         delay = 1
         for attempt in range(self.max_retries):
+            self.rate_limiter.acquire(estimated_tokens)
             response = self._client.post(
                 cast(str, self.api_url), json=payload, headers=headers
             )
             if response.status_code in {429} or 500 <= response.status_code < 600:
                 if attempt == self.max_retries - 1:
                     response.raise_for_status()
-                time.sleep(delay)
+                # The server's reset hint can only lengthen the backoff: a stale
+                # or zero hint must not collapse the retries into a burst.
+                # Jitter keeps concurrent workers from retrying in lockstep.
+                retry_after = self._retry_after(response)
+                wait = delay if retry_after is None else max(delay, retry_after)
+                time.sleep(wait + random.uniform(0, 1))
                 delay *= 2
                 continue
             response.raise_for_status()
@@ -130,47 +232,126 @@ class BaseLLMClient:
                     f" content-type={content_type!r}, body={snippet!r}"
                 ) from exc
             content = data["choices"][0]["message"]["content"]
-            try:
-                response_json = json.loads(content)
-                manifest = response_json.get("manifest", {})
-                markdown = response_json.get("markdown", "")
+            results, structured = parse(content)
 
-                if not manifest or not markdown:
-                    raise ValueError(
-                        "JSON response missing 'manifest' or 'markdown' fields"
+            # Валидация полноты контента
+            complete = not structured or all(
+                self._validate_content_completeness(chapter_html, markdown)
+                for chapter_html, (_, markdown) in zip(chapters, results)
+            )
+            if not complete:
+                if attempt < self.max_retries - 1:
+                    print(
+                        f"Retrying due to incomplete content (attempt {attempt + 1}/{self.max_retries})"
                     )
-
-                validate(instance=manifest, schema=CHAPTER_MANIFEST_SCHEMA)
-
-                # Валидация полноты контента
-                if not self._validate_content_completeness(chapter_html, markdown):
-                    if attempt < self.max_retries - 1:
-                        print(
-                            f"Retrying due to incomplete content (attempt {attempt + 1}/{self.max_retries})"
-                        )
-                        time.sleep(delay)
-                        delay *= 2
-                        continue
-                    else:
-                        print(
-                            "Warning: Content may be incomplete, but proceeding anyway"
-                        )
-
-            except (json.JSONDecodeError, KeyError) as e:
-                # Fallback to old format for backwards compatibility
-                json_match = re.search(r"```json\n(.*?)\n```", content, re.DOTALL)
-                md_match = re.search(r"```markdown\n(.*?)\n```", content, re.DOTALL)
-                if not json_match or not md_match:
-                    raise ValueError(f"LLM response not in expected JSON format: {e}")
-                manifest = json.loads(json_match.group(1))
-                validate(instance=manifest, schema=CHAPTER_MANIFEST_SCHEMA)
-                markdown = md_match.group(1)
-            return manifest, markdown
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                print("Warning: Content may be incomplete, but proceeding anyway")
+            return results
 
         raise RuntimeError(
             f"Failed to obtain response from {self.__class__.__name__} after retries"
         )
 
+    @staticmethod
+    def _parse_chapter(content: str) -> Tuple[Dict[str, Any], str, bool]:
+        """Extract the manifest and Markdown of one chapter from LLM output.
+
+        The third item is ``False`` when the legacy fenced format was parsed.
+        """
+        try:
+            response_json = json.loads(content)
+            manifest = response_json.get("manifest", {})
+            markdown = response_json.get("markdown", "")
+
+            if not manifest or not markdown:
+                raise ValueError(
+                    "JSON response missing 'manifest' or 'markdown' fields"
+                )
+
+            CHAPTER_MANIFEST_VALIDATOR.validate(manifest)
+        except (json.JSONDecodeError, KeyError) as e:
+            # Fallback to old format for backwards compatibility; the two
+            # blocks may come in either order.
+            json_block = _find_fenced_block(content, _JSON_FENCE)
+            md_block = _find_fenced_block(content, _MARKDOWN_FENCE)
+            if json_block is None or md_block is None:
+                raise ValueError(f"LLM response not in expected JSON format: {e}")
+            manifest = json.loads(json_block[0])
+            CHAPTER_MANIFEST_VALIDATOR.validate(manifest)
+            return manifest, md_block[0], False
+        return manifest, markdown, True
+
+    @staticmethod
+    def _parse_chapter_batch(content: str, expected: int) -> ParsedChapters:
+        """Extract ``expected`` manifest/Markdown pairs from a batched response."""
+        structured = True
+        try:
+            response_json = json.loads(content)
+            if not isinstance(response_json, dict):
+                raise ValueError(
+                    "LLM response not in expected JSON format: expected an object"
+                    f" with 'chapters', got {type(response_json).__name__}"
+                )
+            chapters = response_json["chapters"]
+            if not isinstance(chapters, list) or not all(
+                isinstance(item, dict) for item in chapters
+            ):
+                raise ValueError(
+                    "LLM response not in expected JSON format: 'chapters' must be"
+                    " a list of objects"
+                )
+            results = [
+                (item.get("manifest", {}), item.get("markdown", ""))
+                for item in chapters
+            ]
+        except (json.JSONDecodeError, KeyError):
+            # Fallback to consecutive fenced json/markdown block pairs
+            structured = False
+            results = [
+                (json.loads(manifest_src), markdown)
+                for manifest_src, markdown in _iter_fenced_chapters(content)
+            ]
+
+        if len(results) != expected:
+            raise ValueError(
+                f"Expected {expected} chapters in LLM response, got {len(results)}"
+            )
+        for manifest, markdown in results:
+            if not manifest or not markdown:
+                raise ValueError(
+                    "JSON response missing 'manifest' or 'markdown' fields"
+                )
+            CHAPTER_MANIFEST_VALIDATOR.validate(manifest)
+        return results, structured
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]]) -> int:
+        """Estimate the prompt size in tokens for rate limiting."""
+        return sum(len(m["content"]) for m in messages) // CHARS_PER_TOKEN
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float | None:
+        """Seconds to wait before retrying, as advertised by the server."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                reset_at = float(reset)
+            except ValueError:
+                return None
+            # OpenRouter reports the reset time as a Unix timestamp in ms.
+            if reset_at > 1e11:
+                reset_at /= 1000
+            return max(0.0, reset_at - time.time())
+        return None
+
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for the API request. Override in subclasses."""
         return {
@@ -202,6 +383,7 @@ class OpenRouterClient(BaseLLMClient):
         api_url: str | None = None,
         max_retries: int = 5,
         client: httpx.Client | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         api_key = api_key or OPENROUTER_API_KEY
         model = model or OPENROUTER_DEFAULT_MODEL
@@ -214,6 +396,7 @@ class OpenRouterClient(BaseLLMClient):
             api_url=api_url,
             max_retries=max_retries,
             client=client,
+            rate_limiter=rate_limiter,
         )
 
         self.http_referer = HTTP_REFERER or OPENROUTER_HTTP_REFERER
@@ -244,6 +427,7 @@ class MistralClient(BaseLLMClient):
         api_url: str | None = None,
         max_retries: int = 5,
         client: httpx.Client | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         api_key = api_key or MISTRAL_API_KEY
         model = model or MISTRAL_DEFAULT_MODEL
@@ -256,6 +440,7 @@ class MistralClient(BaseLLMClient):
             api_url=api_url,
             max_retries=max_retries,
             client=client,
+            rate_limiter=rate_limiter,
         )
 
         if not self.api_key:
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import os
+from pathlib import Path
 from typing import List, Dict
 
 import frontmatter
@@ -11,19 +12,20 @@ import frontmatter
 
 def inject_navigation_and_create_toc(output_dir: str) -> None:
     """Inject readPrev/readNext into Markdown files and create toc.json."""
+    out = Path(output_dir)
     files = sorted(f for f in os.listdir(output_dir) if f.endswith(".md"))
-    titles: Dict[str, str] = {}
-    for name in files:
-        path = os.path.join(output_dir, name)
-        with open(path, "r", encoding="utf-8") as f:
-            post = frontmatter.load(f)
-        titles[name] = post.get("title", "")
+    # Parse every chapter once; the second pass only rewrites frontmatter.
+    posts = {
+        name: frontmatter.loads((out / name).read_text(encoding="utf-8"))
+        for name in files
+    }
+    titles: Dict[str, str] = {
+        name: post.get("title", "") for name, post in posts.items()
+    }
 
     toc: List[Dict[str, str]] = []
     for idx, name in enumerate(files):
-        path = os.path.join(output_dir, name)
-        with open(path, "r", encoding="utf-8") as f:
-            post = frontmatter.load(f)
+        post = posts[name]
         if idx > 0:
             prev = files[idx - 1]
             post["readPrev"] = {
@@ -36,11 +38,10 @@ def inject_navigation_and_create_toc(output_dir: str) -> None:
                 "to": f"/{os.path.splitext(nxt)[0]}",
                 "label": titles[nxt],
             }
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(frontmatter.dumps(post))
+        (out / name).write_text(frontmatter.dumps(post), encoding="utf-8")
         toc.append({"title": titles[name], "to": f"/{os.path.splitext(name)[0]}"})
 
-    with open(os.path.join(output_dir, "toc.json"), "w", encoding="utf-8") as f:
+    with open(out / "toc.json", "w", encoding="utf-8") as f:
         json.dump(toc, f, ensure_ascii=False, indent=2)
 
 
@@ -6,6 +6,23 @@ from pathlib import Path
 import random
 from typing import Dict, List
 
+_CHAPTER_INSTRUCTIONS = (
+    "Convert this chapter HTML to Markdown.\n\n"
+    "Return ONLY a valid JSON object with exactly these fields:\n"
+    "{\n"
+    '  "manifest": {\n'
+    '    "chapter_number": 1,\n'
+    '    "title": "Chapter Title",\n'
+    '    "filename": "chapter.md",\n'
+    '    "slug": "chapter",\n'
+    '    "readPrev": {"to": "/path", "label": "Previous"}, // optional\n'
+    '    "readNext": {"to": "/path", "label": "Next"} // optional\n'
+    "  },\n"
+    '  "markdown": "Full markdown content with frontmatter..."\n'
+    "}\n\n"
+    "CHAPTER HTML:\n"
+)
+
 
 class PromptBuilder:
     """Builds system and user prompts for chapter conversion."""
@@ -15,6 +32,9 @@ class PromptBuilder:
     ) -> None:
         self.rules = Path(rules_path).read_text(encoding="utf-8")
         self.examples = self._load_examples(samples_dir, num_examples)
+        # Rules and examples are fixed for the builder's lifetime, so the
+        # system prompt is assembled once and shared by every chapter.
+        self._system_message = {"role": "system", "content": self._system_prompt()}
 
     def _load_examples(self, samples_dir: str | Path, num_examples: int) -> str:
         sample_paths = sorted(Path(samples_dir).rglob("*.md"))
@@ -27,8 +47,8 @@ class PromptBuilder:
             contents.append(path.read_text(encoding="utf-8").strip())
         return "\n\n".join(contents)
 
-    def build_for_chapter(self, chapter_html: str) -> List[Dict[str, str]]:
-        system_prompt = (
+    def _system_prompt(self) -> str:
+        return (
             "You are an expert DOCX to Markdown converter. Follow all rules precisely.\n\n"
             "IMPORTANT: The HTML contains semantic markup with CSS classes that indicate formatting intent:\n"
             "- <pre><code class=\"language-X\"> → ```X code blocks\n"
@@ -39,23 +59,36 @@ class PromptBuilder:
             f"FORMATTING RULES:\n{self.rules}\n\n"
             f"EXAMPLES:\n{self.examples}"
         )
+
+    def build_for_chapter(self, chapter_html: str) -> List[Dict[str, str]]:
+        user_prompt = f"{_CHAPTER_INSTRUCTIONS}```html\n{chapter_html}\n```"
+        return [
+            dict(self._system_message),
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def build_for_chapters(self, chapters: List[str]) -> List[Dict[str, str]]:
+        """Build one request that converts several chapters at once."""
+        sections = "\n\n".join(
+            f"### CHAPTER {idx}\n```html\n{chapter_html}\n```"
+            for idx, chapter_html in enumerate(chapters, start=1)
+        )
         user_prompt = (
-            "Convert this chapter HTML to Markdown.\n\n"
-            "Return ONLY a valid JSON object with exactly these fields:\n"
+            f"Convert each of the following {len(chapters)} HTML chapters to "
+            "Markdown independently.\n\n"
+            "Return ONLY a valid JSON object with exactly this field:\n"
             "{\n"
-            '  "manifest": {\n'
-            '    "chapter_number": 1,\n'
-            '    "title": "Chapter Title",\n'
-            '    "filename": "chapter.md",\n'
-            '    "slug": "chapter",\n'
-            '    "readPrev": {"to": "/path", "label": "Previous"}, // optional\n'
-            '    "readNext": {"to": "/path", "label": "Next"} // optional\n'
-            "  },\n"
-            '  "markdown": "Full markdown content with frontmatter..."\n'
-            "}\n\n"
-            f"CHAPTER HTML:\n```html\n{chapter_html}\n```"
+            '  "chapters": [\n'
+            '    {"manifest": {...}, "markdown": "..."}\n'
+            "  ]\n"
+            "}\n"
+            "The list must contain one entry per chapter, in the order given. "
+            "Each manifest has the fields chapter_number, title, filename, slug "
+            "and optional readPrev/readNext; each markdown is the full chapter "
+            "content with frontmatter.\n\n"
+            f"CHAPTERS:\n{sections}"
         )
         return [
-            {"role": "system", "content": system_prompt},
+            dict(self._system_message),
             {"role": "user", "content": user_prompt},
         ]
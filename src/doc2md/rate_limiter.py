@@ -0,0 +1,69 @@
+"""Client-side throttling for LLM API requests."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests per minute and tokens per minute.
+
+    Each budget is a bucket that refills continuously up to its per-minute
+    capacity. ``acquire`` blocks until both buckets can cover the request, so
+    concurrent callers are spread out instead of bursting into HTTP 429
+    responses. A limit of ``0`` disables that bucket.
+    """
+
+    def __init__(
+        self, requests_per_minute: float = 0, tokens_per_minute: float = 0
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._available_requests = float(requests_per_minute)
+        self._available_tokens = float(tokens_per_minute)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_update
+        self._last_update = now
+        self._available_requests = min(
+            self.requests_per_minute,
+            self._available_requests + self.requests_per_minute * elapsed / 60.0,
+        )
+        self._available_tokens = min(
+            self.tokens_per_minute,
+            self._available_tokens + self.tokens_per_minute * elapsed / 60.0,
+        )
+
+    def _wait_time(self, tokens: float) -> float:
+        wait = 0.0
+        if self.requests_per_minute and self._available_requests < 1:
+            missing = 1 - self._available_requests
+            wait = max(wait, missing * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute and self._available_tokens < tokens:
+            missing = tokens - self._available_tokens
+            wait = max(wait, missing * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one request of ``tokens`` estimated tokens may be sent."""
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+        # A request larger than the whole bucket would otherwise wait forever.
+        needed = min(float(tokens), float(self.tokens_per_minute))
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                wait = self._wait_time(needed)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._available_requests -= 1
+                    if self.tokens_per_minute:
+                        self._available_tokens -= needed
+                    return
+            time.sleep(wait)
+
+
+__all__ = ["RateLimiter"]
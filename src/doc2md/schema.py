@@ -10,6 +10,8 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from jsonschema import Draft7Validator
+
 
 CHAPTER_MANIFEST_SCHEMA: Dict[str, Any] = {
     "type": "object",
@@ -56,4 +58,9 @@ CHAPTER_MANIFEST_SCHEMA: Dict[str, Any] = {
     "additionalProperties": False,
 }
 
-__all__ = ["CHAPTER_MANIFEST_SCHEMA"]
+Draft7Validator.check_schema(CHAPTER_MANIFEST_SCHEMA)
+
+# Built once so per-chapter validation does not re-process the schema.
+CHAPTER_MANIFEST_VALIDATOR = Draft7Validator(CHAPTER_MANIFEST_SCHEMA)
+
+__all__ = ["CHAPTER_MANIFEST_SCHEMA", "CHAPTER_MANIFEST_VALIDATOR"]
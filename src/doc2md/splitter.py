@@ -7,11 +7,14 @@ from typing import List
 from bs4 import BeautifulSoup
 
 
-def split_html_by_h1(html_content: str) -> List[str]:
-    """Split HTML content into fragments by <h1> headings."""
+def split_html_by_h1(html_content: str, limit: int | None = None) -> List[str]:
+    """Split HTML content into fragments by <h1> headings.
+
+    When ``limit`` is given, only the first ``limit`` chapters are serialized.
+    """
     soup = BeautifulSoup(html_content, "lxml")
     chapters: List[str] = []
-    for h1 in soup.find_all("h1"):
+    for h1 in soup.find_all("h1", limit=limit):
         parts = [str(h1)]
         for sibling in h1.next_siblings:
             if getattr(sibling, "name", None) == "h1":
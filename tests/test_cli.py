@@ -1,18 +1,25 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 from typer.testing import CliRunner
 
+from doc2md import cli
 from doc2md.cli import app
 
 runner = CliRunner()
 
 
-def _patch_preprocess(monkeypatch) -> None:
+@pytest.fixture
+def patch_preprocess(monkeypatch) -> None:
     def fake_convert(docx_path: str, style_map_path: str) -> str:
         return "<h1>Chap</h1><p>Body</p>"
 
     def fake_extract(docx_path: str, output_dir: str) -> None:
         pass
 
-    def fake_split(html: str):
+    def fake_split(html: str, limit=None):
         return ["<h1>Chap</h1><p>Body</p>"]
 
     monkeypatch.setattr("doc2md.preprocess.convert_docx_to_html", fake_convert)
@@ -20,9 +27,7 @@ def _patch_preprocess(monkeypatch) -> None:
     monkeypatch.setattr("doc2md.splitter.split_html_by_h1", fake_split)
 
 
-def test_run_dry_run_skips_llm(monkeypatch, tmp_path) -> None:
-    _patch_preprocess(monkeypatch)
-
+def test_run_dry_run_skips_llm(patch_preprocess, monkeypatch, tmp_path) -> None:
     called = {"client": False}
 
     class DummyClient:
@@ -40,9 +45,7 @@ def test_run_dry_run_skips_llm(monkeypatch, tmp_path) -> None:
     assert not called["client"]
 
 
-def test_run_passes_model_option(monkeypatch, tmp_path) -> None:
-    _patch_preprocess(monkeypatch)
-
+def test_run_passes_model_option(patch_preprocess, monkeypatch, tmp_path) -> None:
     class FakeBuilder:
         def build_for_chapter(self, html: str):
             return []
@@ -120,3 +123,163 @@ def test_run_dry_run_with_empty_chapters_list(monkeypatch, tmp_path) -> None:
     content = full_doc.read_text(encoding="utf-8")
     assert "<p>Some content without h1 tags</p>" in content
     assert "<h2>Subheading</h2>" in content
+
+
+def test_run_dry_run_writes_chapter_html(
+    patch_preprocess, monkeypatch, tmp_path
+) -> None:
+    chapters = [f"<h1>Chap {i}</h1><p>Тело {i}</p>" for i in range(1, 5)]
+    monkeypatch.setattr(
+        "doc2md.splitter.split_html_by_h1", lambda html, limit=None: chapters
+    )
+
+    result = runner.invoke(
+        app, ["run", "input.docx", "--out", str(tmp_path), "--dry-run"]
+    )
+
+    assert result.exit_code == 0
+    chapter_file = tmp_path / "html" / "chapter_1.html"
+    assert chapter_file.read_text(encoding="utf-8") == chapters[3]
+
+
+def test_convert_batches_stops_after_failure(monkeypatch, tmp_path) -> None:
+    calls: list[str] = []
+    second_started = threading.Event()
+    failure_seen = threading.Event()
+
+    class ObservedExecutor(ThreadPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            if cancel_futures:
+                # The pool only cancels after the failing batch was collected.
+                # Waiting for batch 2 to start makes the outcome deterministic.
+                assert second_started.wait(timeout=5)
+                super().shutdown(wait=False, cancel_futures=True)
+                failure_seen.set()
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    class FailingClient:
+        def format_chapter(self, chapter_html: str):
+            calls.append(chapter_html)
+            if chapter_html == "1":
+                raise RuntimeError("boom")
+            second_started.set()
+            assert failure_seen.wait(timeout=5)
+            return ({"filename": f"{chapter_html}.md"}, "Body")
+
+    monkeypatch.setattr("doc2md.cli.ThreadPoolExecutor", ObservedExecutor)
+    batches = [[(idx, str(idx))] for idx in range(1, 5)]
+    with pytest.raises(RuntimeError, match="boom"):
+        cli._convert_batches(
+            FailingClient(), batches, "doc", tmp_path, 1, lambda count: None
+        )
+
+    assert calls == ["1", "2"]
+
+
+class RecordingClient:
+    """Fake LLM client that names each chapter file after its HTML."""
+
+    def __init__(self, *a, **k) -> None:
+        self.formatted: list[str] = []
+
+    def _result(self, chapter_html: str):
+        self.formatted.append(chapter_html)
+        return ({"filename": f"{chapter_html}.md"}, f"## {chapter_html}\nBody")
+
+    def format_chapter(self, chapter_html: str):
+        return self._result(chapter_html)
+
+    def format_chapters(self, chapters):
+        return [self._result(chapter_html) for chapter_html in chapters]
+
+
+def test_convert_batches_writes_files_and_advances_by_batch(tmp_path) -> None:
+    client = RecordingClient()
+    advanced: list[int] = []
+    batches = [[(1, "one"), (2, "two")], [(3, "three")]]
+
+    cli._convert_batches(client, batches, "doc", tmp_path, 2, advanced.append)
+
+    assert sorted(advanced) == [1, 2]
+    assert sorted(client.formatted) == ["one", "three", "two"]
+    assert (tmp_path / "one.md").read_text(encoding="utf-8") == "## 1.1 one\nBody"
+    assert (tmp_path / "two.md").read_text(encoding="utf-8") == "## 2.1 two\nBody"
+    assert (tmp_path / "three.md").read_text(encoding="utf-8") == "## 3.1 three\nBody"
+
+
+def test_run_formats_only_fourth_chapter(
+    patch_preprocess, monkeypatch, tmp_path
+) -> None:
+    chapters = [f"chap{i}" for i in range(1, 6)]
+    monkeypatch.setattr(
+        "doc2md.splitter.split_html_by_h1", lambda html, limit=None: chapters
+    )
+    monkeypatch.setattr("doc2md.prompt_builder.PromptBuilder", lambda *a, **k: None)
+    client = RecordingClient()
+    monkeypatch.setattr("doc2md.llm_client.OpenRouterClient", lambda *a, **k: client)
+
+    advanced: list[int] = []
+
+    class FakeProgress:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+        def add_task(self, description: str, total: int) -> int:
+            return 0
+
+        def advance(self, task: int, count: int) -> None:
+            advanced.append(count)
+
+    monkeypatch.setattr("doc2md.cli.Progress", FakeProgress)
+
+    result = runner.invoke(
+        app, ["run", "input.docx", "--out", str(tmp_path), "--batch-size", "2"]
+    )
+
+    assert result.exit_code == 0
+    assert client.formatted == ["chap4"]
+    assert advanced == [1]
+    assert (tmp_path / "chap4.md").exists()
+    assert (tmp_path / "toc.json").exists()
+
+
+def test_log_level_accepts_names_and_numbers() -> None:
+    assert cli._log_level("DEBUG") == logging.DEBUG
+    assert cli._log_level("warning") == logging.WARNING
+    assert cli._log_level("10") == 10
+    assert cli._log_level("VERBOSE") is None
+
+
+def test_run_falls_back_to_info_for_unknown_log_level(
+    patch_preprocess, monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setattr("doc2md.cli.LOG_LEVEL", "VERBOSE")
+    configured: dict = {}
+    monkeypatch.setattr(
+        "doc2md.cli.logging.basicConfig", lambda **kw: configured.update(kw)
+    )
+
+    result = runner.invoke(
+        app, ["run", "input.docx", "--out", str(tmp_path), "--dry-run"]
+    )
+
+    assert result.exit_code == 0
+    assert configured["level"] == logging.INFO
+
+
+def test_run_logs_config_warnings(patch_preprocess, monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr("doc2md.cli.CONFIG_WARNINGS", ["Invalid limit"])
+    logged: list[str] = []
+    monkeypatch.setattr(
+        "doc2md.cli.logging.warning", lambda msg, *a: logged.append(msg)
+    )
+
+    result = runner.invoke(
+        app, ["run", "input.docx", "--out", str(tmp_path), "--dry-run"]
+    )
+
+    assert result.exit_code == 0
+    assert "Invalid limit" in logged
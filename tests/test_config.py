@@ -0,0 +1,16 @@
+import pytest
+
+from doc2md import config
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected", "warned"),
+    [("30", 30.0, False), ("0", 0.0, False), ("abc", 0.0, True), ("-5", 0.0, True)],
+)
+def test_rate_limit_parses_env(monkeypatch, raw, expected, warned) -> None:
+    warnings: list[str] = []
+    monkeypatch.setattr(config, "CONFIG_WARNINGS", warnings)
+    monkeypatch.setenv("DOC2MD_TEST_LIMIT", raw)
+
+    assert config._rate_limit("DOC2MD_TEST_LIMIT") == expected
+    assert bool(warnings) == warned
@@ -1,3 +1,5 @@
+import os
+
 import doc2md.heading_numbering as hn
 
 
@@ -11,3 +13,105 @@ def test_add_numbering_anchor_followed_by_text(monkeypatch):
 
     result = hn.add_numbering_to_html(html, "dummy.docx")
     assert result.startswith("<h2>1.2 Функции</h2>Комплекс")
+
+
+def _save_toc_docx(path, entries):
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+
+    doc = Document()
+    for level, line in entries:
+        style = doc.styles.add_style(f"toc {level}", WD_STYLE_TYPE.PARAGRAPH)
+        doc.add_paragraph(line, style=style)
+    doc.save(path)
+
+
+def test_toc_extractors_share_cached_parse(tmp_path, monkeypatch):
+    path = tmp_path / "doc.docx"
+    _save_toc_docx(path, [(1, "1 Общие сведения\t3"), (2, "1.1 Назначение\t4")])
+
+    assert hn.extract_heading_structure_from_toc(str(path)) == [
+        (1, "1", "Общие сведения"),
+        (2, "1.1", "Назначение"),
+    ]
+
+    def fail(_):
+        raise AssertionError("document parsed twice")
+
+    monkeypatch.setattr(hn, "_iter_body_paragraphs", fail)
+    assert hn.extract_heading_numbering_from_toc(str(path)) == {
+        "Общие сведения": "1",
+        "Назначение": "1.1",
+    }
+
+
+def test_toc_cache_invalidated_when_file_changes(tmp_path):
+    path = tmp_path / "doc.docx"
+    _save_toc_docx(path, [(1, "1 Первая\t3")])
+    assert hn.extract_heading_structure_from_toc(str(path)) == [(1, "1", "Первая")]
+
+    _save_toc_docx(path, [(1, "2 Вторая\t5")])
+    os.utime(path, ns=(0, 0))
+
+    assert hn.extract_heading_structure_from_toc(str(path)) == [(1, "2", "Вторая")]
+
+
+def test_get_heading_number_for_text_fuzzy_match():
+    numbering_map = {
+        "Общие сведения": "1",
+        "Назначение комплекса": "1.1",
+        "Назначение плагинов комплекса": "1.2",
+    }
+
+    assert hn.get_heading_number_for_text(" Общие сведения ", numbering_map) == "1"
+    assert (
+        hn.get_heading_number_for_text("назначение комплекса", numbering_map) == "1.1"
+    )
+    assert hn.get_heading_number_for_text("Неизвестный раздел", numbering_map) is None
+
+    numbering_map["Установка и запуск"] = "4"
+    assert hn.get_heading_number_for_text("установка и запуск", numbering_map) == "4"
+
+
+def test_get_heading_number_for_text_sees_in_place_updates():
+    numbering_map = {
+        "Общие сведения": "1",
+        "Назначение комплекса": "1.1",
+    }
+    lookup = hn.get_heading_number_for_text
+    # Lower-case queries miss the exact lookup and go through the fuzzy index.
+    assert lookup("назначение комплекса", numbering_map) == "1.1"
+
+    numbering_map["Назначение комплекса"] = "2.1"
+    assert lookup("назначение комплекса", numbering_map) == "2.1"
+
+    del numbering_map["Общие сведения"]
+    numbering_map["Состав комплекса"] = "3"
+    assert lookup("состав комплекса", numbering_map) == "3"
+
+
+def test_get_heading_number_for_text_uses_prebuilt_index(monkeypatch):
+    numbering_map = {
+        "Общие сведения": "1",
+        "Назначение комплекса": "1.1",
+    }
+    index = hn.TitleIndex(numbering_map)
+
+    def fail(items):
+        raise AssertionError("cached index should not be looked up")
+
+    monkeypatch.setattr(hn, "_title_index", fail)
+    lookup = hn.get_heading_number_for_text
+    assert lookup("назначение комплекса", numbering_map, index) == "1.1"
+    assert lookup("Общие сведения", numbering_map, index) == "1"
+
+
+def test_parse_toc_line():
+    assert hn._parse_toc_line("4.1.2 Подготовка файлов\t42") == (
+        "4.1.2",
+        "Подготовка файлов",
+    )
+    assert hn._parse_toc_line("1 Общие сведения") == ("1", "Общие сведения")
+    assert hn._parse_toc_line("1. Введение") is None
+    assert hn._parse_toc_line("Введение\t3") is None
+    assert hn._parse_toc_line("2 Назначение\tстр. 5") is None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import httpx
+import pytest
 
 from typing import Any
 import json
@@ -12,6 +13,9 @@ class DummyBuilder(PromptBuilderProtocol):
     def build_for_chapter(self, chapter_html: str):  # type: ignore[override]
         return [{"role": "user", "content": chapter_html}]
 
+    def build_for_chapters(self, chapters):  # type: ignore[override]
+        return [{"role": "user", "content": "\n".join(chapters)}]
+
 
 def _make_success_response():
     content = """```json
@@ -28,51 +32,106 @@ def _make_success_response():
     return {"choices": [{"message": {"content": content}}]}
 
 
-def test_format_chapter_parses_blocks() -> None:
-    transport = httpx.MockTransport(
-        lambda request: httpx.Response(200, json=_make_success_response())
-    )
-    client = OpenRouterClient(
-        DummyBuilder(), api_key="k", client=httpx.Client(transport=transport)
+EXPECTED_MANIFEST = {
+    "chapter_number": 1,
+    "title": "One",
+    "filename": "1.one.md",
+    "slug": "one",
+}
+
+
+@pytest.fixture
+def client_factory():
+    """Build a client whose HTTP calls are answered by a mock transport.
+
+    ``responses`` is either a request handler or a list of responses that are
+    returned in order.
+    """
+
+    def make(responses, client_cls=OpenRouterClient, **kwargs):
+        if callable(responses):
+            handler = responses
+        else:
+            queue = list(responses)
+
+            def handler(request: httpx.Request) -> httpx.Response:
+                return queue.pop(0)
+
+        transport = httpx.MockTransport(handler)
+        return client_cls(
+            DummyBuilder(),
+            api_key="k",
+            client=httpx.Client(transport=transport),
+            **kwargs,
+        )
+
+    return make
+
+
+def test_format_chapter_parses_blocks(client_factory) -> None:
+    client = client_factory([httpx.Response(200, json=_make_success_response())])
+    manifest, markdown = client.format_chapter("<h1>One</h1>")
+    assert manifest == EXPECTED_MANIFEST
+    assert markdown == "# One"
+
+
+def test_format_chapter_accepts_markdown_block_first(client_factory) -> None:
+    content = (
+        "```markdown\n# One\n```\n"
+        "```json\n" + json.dumps(EXPECTED_MANIFEST) + "\n```"
     )
+    body = {"choices": [{"message": {"content": content}}]}
+    client = client_factory([httpx.Response(200, json=body)])
     manifest, markdown = client.format_chapter("<h1>One</h1>")
-    expected_manifest = {
-        "chapter_number": 1,
-        "title": "One",
-        "filename": "1.one.md",
-        "slug": "one",
-    }
-    assert manifest == expected_manifest
+    assert manifest == EXPECTED_MANIFEST
     assert markdown == "# One"
 
 
-def test_format_chapter_retries_on_429(monkeypatch) -> None:
+def test_format_chapter_retries_on_429(client_factory, monkeypatch) -> None:
     responses = [
         httpx.Response(429, json={"error": "Too Many"}),
         httpx.Response(200, json=_make_success_response()),
     ]
-    transport = httpx.MockTransport(lambda request: responses.pop(0))
     sleep_calls: list[int] = []
     monkeypatch.setattr("doc2md.llm_client.time.sleep", lambda s: sleep_calls.append(s))
-    client = OpenRouterClient(
-        DummyBuilder(),
-        api_key="k",
-        client=httpx.Client(transport=transport),
-        max_retries=2,
-    )
+    monkeypatch.setattr("doc2md.llm_client.random.uniform", lambda a, b: 0)
+    client = client_factory(responses, max_retries=2)
     manifest, markdown = client.format_chapter("<h1>One</h1>")
     assert markdown == "# One"
-    expected_manifest = {
-        "chapter_number": 1,
-        "title": "One",
-        "filename": "1.one.md",
-        "slug": "one",
-    }
-    assert manifest == expected_manifest
+    assert manifest == EXPECTED_MANIFEST
     assert sleep_calls == [1]
 
 
-def test_format_chapter_adds_extra_headers(monkeypatch) -> None:
+def test_format_chapter_honours_retry_after(client_factory, monkeypatch) -> None:
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "7"}, json={"error": "Slow"}),
+        httpx.Response(200, json=_make_success_response()),
+    ]
+    sleep_calls: list[float] = []
+    monkeypatch.setattr("doc2md.llm_client.time.sleep", lambda s: sleep_calls.append(s))
+    monkeypatch.setattr("doc2md.llm_client.random.uniform", lambda a, b: 0.5)
+    client = client_factory(responses, max_retries=2)
+    client.format_chapter("<h1>One</h1>")
+    assert sleep_calls == [7.5]
+
+
+def test_format_chapter_keeps_backoff_with_stale_reset(
+    client_factory, monkeypatch
+) -> None:
+    stale_reset = {"X-RateLimit-Reset": "1000000000000"}  # 2001, in ms
+    responses = [
+        httpx.Response(429, headers=stale_reset, json={"error": "Too Many"})
+        for _ in range(3)
+    ] + [httpx.Response(200, json=_make_success_response())]
+    sleep_calls: list[float] = []
+    monkeypatch.setattr("doc2md.llm_client.time.sleep", lambda s: sleep_calls.append(s))
+    monkeypatch.setattr("doc2md.llm_client.random.uniform", lambda a, b: 0)
+    client = client_factory(responses, max_retries=4)
+    client.format_chapter("<h1>One</h1>")
+    assert sleep_calls == [1, 2, 4]
+
+
+def test_format_chapter_adds_extra_headers(client_factory, monkeypatch) -> None:
     monkeypatch.setattr("doc2md.llm_client.HTTP_REFERER", "https://example.com")
     monkeypatch.setattr("doc2md.llm_client.APP_TITLE", "Example")
 
@@ -88,27 +147,82 @@ def test_format_chapter_adds_extra_headers(monkeypatch) -> None:
         )
         return httpx.Response(200, json=_make_success_response())
 
-    transport = httpx.MockTransport(handler)
-    client = OpenRouterClient(
-        DummyBuilder(), api_key="k", client=httpx.Client(transport=transport)
-    )
+    client = client_factory(handler)
     client.format_chapter("<h1>One</h1>")
     assert captured["Authorization"] == "Bearer k"
     assert captured["HTTP-Referer"] == "https://example.com"
     assert captured["X-Title"] == "Example"
 
 
-def test_mistral_client_uses_random_seed() -> None:
+def test_mistral_client_uses_random_seed(client_factory) -> None:
     captured_payload: dict[str, Any] = {}
 
     def handler(request: httpx.Request) -> httpx.Response:
         captured_payload.update(json.loads(request.content.decode()))
         return httpx.Response(200, json=_make_success_response())
 
-    transport = httpx.MockTransport(handler)
-    client = MistralClient(
-        DummyBuilder(), api_key="k", client=httpx.Client(transport=transport)
-    )
+    client = client_factory(handler, MistralClient)
     client.format_chapter("<h1>One</h1>")
     assert "random_seed" in captured_payload
     assert "seed" not in captured_payload
+
+
+def test_format_chapters_parses_batched_response(client_factory) -> None:
+    chapters = [
+        {
+            "manifest": {
+                "chapter_number": n,
+                "title": title,
+                "filename": f"{n}.{title.lower()}.md",
+                "slug": title.lower(),
+            },
+            "markdown": f"# {title}",
+        }
+        for n, title in [(1, "One"), (2, "Two")]
+    ]
+    body = {"choices": [{"message": {"content": json.dumps({"chapters": chapters})}}]}
+    client = client_factory([httpx.Response(200, json=body)])
+    results = client.format_chapters(["<h1>One</h1>", "<h1>Two</h1>"])
+    assert [manifest["filename"] for manifest, _ in results] == [
+        "1.one.md",
+        "2.two.md",
+    ]
+    assert [markdown for _, markdown in results] == ["# One", "# Two"]
+
+
+def test_format_chapters_rejects_missing_chapters(client_factory) -> None:
+    client = client_factory(
+        lambda request: httpx.Response(200, json=_make_success_response())
+    )
+    with pytest.raises(ValueError, match="Expected 2 chapters"):
+        client.format_chapters(["<h1>One</h1>", "<h1>Two</h1>"])
+
+
+def test_format_chapter_skips_completeness_retry_for_fenced_format(
+    client_factory, monkeypatch
+) -> None:
+    sleep_calls: list[float] = []
+    monkeypatch.setattr("doc2md.llm_client.time.sleep", lambda s: sleep_calls.append(s))
+    client = client_factory([httpx.Response(200, json=_make_success_response())])
+    # "Missing" is absent from the Markdown, which would fail the check
+    manifest, markdown = client.format_chapter("<h1>One</h1><h2>Missing</h2>")
+    assert markdown == "# One"
+    assert sleep_calls == []
+
+
+def test_format_chapters_rejects_non_object_json(client_factory) -> None:
+    body = {"choices": [{"message": {"content": json.dumps([1, 2])}}]}
+    client = client_factory([httpx.Response(200, json=body)])
+    with pytest.raises(ValueError, match="expected an object"):
+        client.format_chapters(["<h1>One</h1>", "<h1>Two</h1>"])
+
+
+@pytest.mark.parametrize("chapters", [[1, 2], {"manifest": {}, "markdown": ""}, None])
+def test_format_chapters_rejects_malformed_chapters_field(
+    client_factory, chapters
+) -> None:
+    content = json.dumps({"chapters": chapters})
+    body = {"choices": [{"message": {"content": content}}]}
+    client = client_factory([httpx.Response(200, json=body)])
+    with pytest.raises(ValueError, match="not in expected JSON format"):
+        client.format_chapters(["<h1>One</h1>", "<h1>Two</h1>"])
@@ -20,3 +20,15 @@ def test_build_for_chapter_includes_rules_examples_and_html(monkeypatch) -> None
     assert user["role"] == "user"
     assert "CHAPTER HTML:" in user["content"]
     assert "<h1>Chap</h1>" in user["content"]
+
+
+def test_build_for_chapters_numbers_each_chapter(monkeypatch) -> None:
+    monkeypatch.setattr(random, "sample", lambda seq, k: list(seq)[:k])
+    builder = PromptBuilder("formatting_rules.md", "samples")
+    messages = builder.build_for_chapters(["<h1>One</h1>", "<h1>Two</h1>"])
+
+    assert messages[0] == builder.build_for_chapter("")[0]
+    user = messages[1]["content"]
+    assert '"chapters"' in user
+    assert user.index("### CHAPTER 1") < user.index("<h1>One</h1>")
+    assert user.index("### CHAPTER 2") < user.index("<h1>Two</h1>")
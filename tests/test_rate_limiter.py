@@ -0,0 +1,54 @@
+from doc2md.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _patch_clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr("doc2md.rate_limiter.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("doc2md.rate_limiter.time.sleep", clock.sleep)
+    return clock
+
+
+def test_unlimited_limiter_never_waits(monkeypatch) -> None:
+    clock = _patch_clock(monkeypatch)
+    limiter = RateLimiter()
+    for _ in range(100):
+        limiter.acquire(10_000)
+    assert clock.sleeps == []
+
+
+def test_requests_per_minute_spreads_requests(monkeypatch) -> None:
+    clock = _patch_clock(monkeypatch)
+    limiter = RateLimiter(requests_per_minute=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [30.0]
+
+
+def test_tokens_per_minute_waits_for_refill(monkeypatch) -> None:
+    clock = _patch_clock(monkeypatch)
+    limiter = RateLimiter(tokens_per_minute=600)
+    limiter.acquire(600)
+    limiter.acquire(300)
+    assert clock.sleeps == [30.0]
+
+
+def test_oversized_request_is_capped_to_bucket(monkeypatch) -> None:
+    clock = _patch_clock(monkeypatch)
+    limiter = RateLimiter(tokens_per_minute=100)
+    limiter.acquire(1_000)
+    assert clock.sleeps == []
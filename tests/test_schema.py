@@ -3,7 +3,7 @@ from __future__ import annotations
 import pytest
 from jsonschema import validate, ValidationError
 
-from doc2md.schema import CHAPTER_MANIFEST_SCHEMA
+from doc2md.schema import CHAPTER_MANIFEST_SCHEMA, CHAPTER_MANIFEST_VALIDATOR
 
 
 def test_schema_structure() -> None:
@@ -83,3 +83,17 @@ def test_schema_validation_invalid_navigation() -> None:
     }
     with pytest.raises(ValidationError):
         validate(manifest, CHAPTER_MANIFEST_SCHEMA)
+
+
+def test_compiled_validator_matches_schema() -> None:
+    """The prebuilt validator enforces the same rules as the schema."""
+    manifest = {
+        "chapter_number": 0,
+        "title": "Intro",
+        "filename": "1.intro.md",
+        "slug": "intro",
+    }
+    with pytest.raises(ValidationError):
+        CHAPTER_MANIFEST_VALIDATOR.validate(manifest)
+    manifest["chapter_number"] = 1
+    CHAPTER_MANIFEST_VALIDATOR.validate(manifest)
@@ -20,3 +20,10 @@ def test_split_html_by_h1_empty_html_returns_empty_list() -> None:
     """Test that empty HTML returns empty list."""
     chapters = split_html_by_h1("")
     assert len(chapters) == 0
+
+
+def test_split_html_by_h1_limit_stops_early() -> None:
+    html = "<h1>One</h1><p>A</p><h1>Two</h1><p>B</p><h1>Three</h1><p>C</p>"
+    chapters = split_html_by_h1(html, limit=2)
+    assert len(chapters) == 2
+    assert chapters[1] == "<h1>Two</h1><p>B</p>"